@@ -0,0 +1,150 @@
+import os
+import argparse
+import pytest
+import importlib.util
+import concurrent.futures
+from unittest.mock import MagicMock
+
+# Dynamically load the `website-monitor.py` module
+MODULE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "website-monitor.py"))
+MODULE_NAME = "website_monitor"
+
+spec = importlib.util.spec_from_file_location(MODULE_NAME, MODULE_PATH)
+website_monitor = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(website_monitor)
+website_monitor.LOG_FILE = os.devnull  # Keep test runs from writing a log file
+
+@pytest.mark.parametrize("value, expected", [
+    ("10", 10.0),
+    ("2.5", 2.5),
+    ("3,15", (3.0, 15.0)),
+    ("3.05,15", (3.05, 15.0)),
+])
+def test_parse_timeout_valid(value, expected):
+    """Test that a single timeout and a CONNECT,READ pair are parsed."""
+    assert website_monitor.parse_timeout(value) == expected
+
+@pytest.mark.parametrize("value", ["abc", "0", "-1", "nan", "inf", "3,0", "3,-1", "nan,15", "1,2,3", ""])
+def test_parse_timeout_invalid(value):
+    """Test that non-numeric, non-positive and non-finite timeouts are rejected."""
+    with pytest.raises(argparse.ArgumentTypeError):
+        website_monitor.parse_timeout(value)
+
+def test_positive_int():
+    """Test that worker counts must be positive integers."""
+    assert website_monitor.positive_int("8") == 8
+    for value in ("0", "-2", "1.5", "many"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            website_monitor.positive_int(value)
+
+@pytest.fixture
+def neg_cache_path(tmp_path):
+    """Fixture giving a negative cache path inside a temp directory."""
+    return str(tmp_path / "neg_cache")
+
+def test_negative_cache_from_worker_threads(neg_cache_path):
+    """Test that the negative cache can be read and written from pool threads and persists across runs."""
+    cache = website_monitor.NegativeCache(neg_cache_path, ttl=60)
+    urls = [f"https://example.com/{i}.png" for i in range(20)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda url: cache.record(url, 404), urls))
+        assert all(pool.map(cache.is_dead, urls))
+        assert not pool.submit(cache.is_dead, "https://example.com/ok.png").result()
+    cache.close()
+
+    reopened = website_monitor.NegativeCache(neg_cache_path, ttl=60)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(reopened.is_dead, urls))
+    reopened.close()
+
+def test_negative_cache_ttl_expiry(neg_cache_path):
+    """Test that failures older than the TTL are no longer treated as dead."""
+    cache = website_monitor.NegativeCache(neg_cache_path, ttl=0)
+    cache.record("https://example.com/broken.png", 404)
+    assert not cache.is_dead("https://example.com/broken.png")
+    cache.close()
+
+def test_is_image_ok_treats_cache_errors_as_miss():
+    """Test that a failing negative cache does not prevent the real check."""
+    cache = MagicMock()
+    cache.is_dead.side_effect = RuntimeError("cache unavailable")
+    cache.record.side_effect = RuntimeError("cache unavailable")
+    session = MagicMock()
+    session.head.return_value.status_code = 404
+    assert website_monitor.is_image_ok(session, "https://example.com/broken.png", neg_cache=cache) is False
+    session.head.return_value.status_code = 200
+    assert website_monitor.is_image_ok(session, "https://example.com/valid.png", neg_cache=cache) is True
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://example.com/a#section", "https://example.com/a"),
+    ("HTTPS://Example.COM/Path", "https://example.com/Path"),
+    ("https://example.com", "https://example.com/"),
+    ("https://example.com/a?", "https://example.com/a"),
+    ("https://example.com/a?b=2&a=1", "https://example.com/a?a=1&b=2"),
+    ("https://example.com/a?flag", "https://example.com/a?flag"),
+    ("https://example.com/a?b=1&", "https://example.com/a?b=1"),
+    ("https://example.com/a?&b=1&&a=2", "https://example.com/a?a=2&b=1"),
+    ("https://example.com/a?q=%E9&flag", "https://example.com/a?flag&q=%E9"),
+    ("https://example.com/a?q=a%2Bb%26c", "https://example.com/a?q=a%2Bb%26c"),
+])
+def test_canonicalize_url(url, expected):
+    """Test URL canonicalization for fragments, case, query order and raw encodings."""
+    assert website_monitor.canonicalize_url(url) == expected
+
+def test_pseudo_urls_are_skipped_case_insensitively():
+    """Test that data:/javascript:/mailto: values are short-circuited regardless of case."""
+    scanner = website_monitor.WebsiteScanner("https://example.com", [])
+    checks = scanner._scan_images("https://example.com/", ["DATA:image/png;base64,xx", "JavaScript:void(0)"])
+    assert [(url, future.result()) for url, future in checks] == [
+        ("DATA:image/png;base64,xx", False),
+        ("JavaScript:void(0)", False),
+    ]
+    hrefs = ["JavaScript:void(0)", "MAILTO:a@example.com", "#top", "/page", "/page#x", "https://other.com/"]
+    assert scanner._extract_links("https://example.com/", hrefs) == ["https://example.com/page"]
+    scanner.img_pool.shutdown()
+
+PARSE_HTML = b"""<html><body>
+    <img src="/img/o'brien.png">
+    <img src='/img/x"y.png'>
+    <img data-src="/lazy.png" srcset="/a.png 1x, /b.png 2x">
+    <IMG alt="logo" SRC="/logo.png">
+    <img src=/unquoted.png>
+    <a href="/search?q=it's">search</a>
+    <a class="nav" href="/p?a=1&amp;b=2">page</a>
+    <a name="anchor">no href</a>
+    <a href=/unquoted>unquoted</a>
+</body></html>"""
+
+@pytest.fixture
+def scanner():
+    """Fixture to create a WebsiteScanner whose pool is shut down after the test."""
+    scanner = website_monitor.WebsiteScanner("https://example.com", [])
+    yield scanner
+    scanner.img_pool.shutdown()
+
+def test_parse_page_fast_path(scanner):
+    """Test regex extraction of quoted src/href values, including mixed quotes and entities."""
+    img_srcs, hrefs = scanner._parse_page(PARSE_HTML)
+    assert img_srcs == ["/img/o'brien.png", '/img/x"y.png', "/logo.png"]
+    assert hrefs == ["/search?q=it's", "/p?a=1&b=2"]
+
+def test_parse_page_strict_path(scanner):
+    """Test that the strict lxml path also handles unquoted attributes."""
+    scanner.strict_parse = True
+    img_srcs, hrefs = scanner._parse_page(PARSE_HTML)
+    assert img_srcs == ["/img/o'brien.png", '/img/x"y.png', None, "/logo.png", "/unquoted.png"]
+    assert hrefs == ["/search?q=it's", "/p?a=1&b=2", "/unquoted"]
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_parse_page_declared_charset(scanner, strict):
+    """Test that attribute values are decoded with the charset from the Content-Type header."""
+    scanner.strict_parse = strict
+    img_srcs, _ = scanner._parse_page('<img src="/caf\xe9.png">'.encode("latin-1"), "iso8859-1")
+    assert img_srcs == ["/caf\xe9.png"]
+
+def test_declared_charset():
+    """Test charset extraction from Content-Type headers."""
+    assert website_monitor._declared_charset("text/html; charset=ISO-8859-1") == "iso8859-1"
+    assert website_monitor._declared_charset('text/html; charset="utf-8"') == "utf-8"
+    assert website_monitor._declared_charset("text/html") is None
+    assert website_monitor._declared_charset("text/html; charset=bogus") is None
@@ -4,24 +4,64 @@
 ReadMe: https://github.com/Dimos082/website-monitor/
 Description:
     Recursively crawls a website (up to a specified depth), scanning each page
-    for broken images using Requests and BeautifulSoup. Gathers results through
-    an Observer Pattern and generates an HTML report.
+    for broken images using Requests and precompiled regexes (a streaming lxml
+    parse behind --strict-parse). Gathers results through an Observer
+    Pattern and generates an HTML report.
 Usage Example:
     python website_monitor.py --url "https://example.com" --output "report.html" --depth 1 --timeout 10
 """
 
-import argparse, requests, sys, os, concurrent.futures
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import argparse, requests, sys, os, re, math, codecs, time, atexit, shelve, threading, concurrent.futures
+from requests.adapters import HTTPAdapter, Retry
+from lxml import etree
+from urllib.parse import urljoin, urlparse, urlunparse
+from html import escape, unescape
+from io import BytesIO
 from datetime import datetime
-from collections import deque
 
 LOG_FILE = os.getenv("LOG_FILE", "website-monitor.log")
-
-def log_message(msg): # Logs to the console and appends to a log file.
-    print(msg)
-    with open(LOG_FILE, "a", encoding="utf-8") as lf:
-        lf.write(f"{datetime.now()} - {msg}\n")
+NEG_CACHE_FILE = os.getenv("NEG_CACHE_FILE", ".wm_neg_cache")
+NEG_TTL = 3600 # Seconds a failed image URL is reported broken without re-probing it
+MAX_PAGE_BYTES = 10 * 1024 * 1024 # Pages larger than this are skipped rather than held in memory
+DEFAULT_TIMEOUT = (3.05, 15) # (connect, read) seconds: fail fast on dead hosts, tolerate slow bodies
+PAGE_TAGS = ("img", "a") # Only <img> and <a> tags are ever inspected
+_BAD_PREFIX = ("data:", "javascript:", "mailto:", "tel:", "#") # src/href values that never name a fetchable resource
+IMG_RE = re.compile(rb'<img\b[^>]*?\ssrc\s*=\s*(["\'])(.*?)\1', re.I) # Fast path: quoted src of <img> tags (group 2), matched on raw bytes
+A_RE = re.compile(rb'<a\b[^>]*?\shref\s*=\s*(["\'])(.*?)\1', re.I) # Fast path: quoted href of <a> tags (group 2), matched on raw bytes
+CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+def _is_pseudo_url(value): # True for data:/javascript:/mailto:/tel:/# values, whatever their case
+    return value[:11].lower().startswith(_BAD_PREFIX) # 11 == len("javascript:"), the longest prefix
+
+def _decode_attr(raw, encoding): # Turns a raw attribute value matched by IMG_RE/A_RE into text, resolving entities such as &amp;
+    return unescape(raw.decode(encoding, "replace"))
+
+def _declared_charset(content_type): # Charset named by a Content-Type header if Python knows the codec, else None.
+    match = CHARSET_RE.search(content_type)
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return None
+
+_LOG_FH = None # Log file handle, opened on first use and kept open for the whole run
+_LOG_LOCK = threading.Lock() # log_message is called from the page and image worker threads
+_TS_CACHE = [0, ""] # [epoch second, formatted timestamp]; reformatted at most once per second
+
+def log_message(msg): # Logs to the console and appends to a log file (buffered, flushed on errors/warnings and at exit).
+    global _LOG_FH
+    with _LOG_LOCK:
+        print(msg)
+        if _LOG_FH is None:
+            _LOG_FH = open(LOG_FILE, "a", encoding="utf-8", buffering=1 << 16)
+            atexit.register(_LOG_FH.close)
+        now = int(time.time())
+        if now != _TS_CACHE[0]:
+            _TS_CACHE[:] = [now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))]
+        _LOG_FH.write(f"{_TS_CACHE[1]} - {msg}\n")
+        if msg.startswith(("[ERROR]", "[WARNING]")):
+            _LOG_FH.flush()
 
 class ObserverBase:
     """Abstract base class for observers. They receive broken image data from pages."""
@@ -58,7 +98,7 @@ class ReportGeneratorObserver(ObserverBase): # REPORT GENERATOR OBSERVER
         total_broken = len(self.broken_assets)
         duration = (self.end_time - self.start_time).total_seconds()
 
-        html = [
+        header = [
             "<html><head>",
             "<meta charset='utf-8'>",
             "<title>Broken Images Report</title>",
@@ -78,18 +118,58 @@ class ReportGeneratorObserver(ObserverBase): # REPORT GENERATOR OBSERVER
             "<tr><th>Broken Image URL</th><th>Found on Page</th></tr>"
         ]
 
-        for page, img in self.broken_assets:
-            html.append(f"<tr><td>{img}</td><td><a href='{page}'>{page}</a></td></tr>")
+        # URLs come from scanned pages, escape them so quotes or markup cannot break the report
+        rows = (f"\n<tr><td>{escape(img)}</td><td><a href='{escape(page)}'>{escape(page)}</a></td></tr>" for page, img in self.broken_assets)
 
-        html.append("</table></body></html>")
-        final_output = "\n".join(html)
-
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            f.write(final_output)
+        with open(self.output_file, "w", encoding="utf-8") as f: # Rows are streamed to the file instead of joined into one string
+            f.write("\n".join(header))
+            f.writelines(rows)
+            f.write("\n</table></body></html>")
 
         log_message(f"[REPORT GENERATED] {self.output_file}")
 
-def is_image_ok(session, url, timeout=5): # Image check utility 
+class NegativeCache: # NEGATIVE CACHE
+    """Persists failed image checks (url -> (status, timestamp)) across runs, so
+    known-dead URLs are reported broken without a network call until the TTL expires.
+    The shelve is only touched in __init__ and close(), on the creating thread: some dbm
+    backends (dbm.sqlite3, the default on Python 3.13) refuse use from other threads."""
+    def __init__(self, path=NEG_CACHE_FILE, ttl=NEG_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries = {} # In-memory view read by the image-check threads
+        self._new = {} # Failures recorded during this run, written back by close()
+        self._lock = threading.Lock()
+        try:
+            with shelve.open(path) as db:
+                now = time.time()
+                self._entries = {url: entry for url, entry in db.items() if now - entry[1] < ttl}
+        except Exception as e:
+            log_message(f"[WARNING] Ignoring unreadable negative cache {path}: {e}")
+
+    def is_dead(self, url): # True if url failed within the last `ttl` seconds.
+        with self._lock:
+            entry = self._entries.get(url)
+        return entry is not None and time.time() - entry[1] < self.ttl
+
+    def record(self, url, status): # Stores a failure; status is None when the request itself raised.
+        entry = (status, time.time())
+        with self._lock:
+            self._entries[url] = entry
+            self._new[url] = entry
+
+    def close(self): # Writes this run's failures back and prunes expired ones. Call from the creating thread.
+        with self._lock:
+            new, self._new = self._new, {}
+        try:
+            with shelve.open(self.path) as db:
+                db.update(new)
+                now = time.time()
+                for url in [url for url, entry in db.items() if now - entry[1] >= self.ttl]:
+                    del db[url]
+        except Exception as e:
+            log_message(f"[WARNING] Could not save negative cache {self.path}: {e}")
+
+def is_image_ok(session, url, timeout=DEFAULT_TIMEOUT, neg_cache=None): # Image check utility 
     if not url: # Returns True if URL is reachable (status < 400), else False.
         return False
 
@@ -98,54 +178,121 @@ def is_image_ok(session, url, timeout=5): # Image check utility
         return False
 
     try:
-        response = session.get(url, timeout=timeout)
-        return response.status_code < 400
+        if neg_cache is not None and neg_cache.is_dead(url): # Known broken within the TTL, skip the network
+            return False
+    except Exception as e: # A cache problem is a cache miss, never a lost check
+        log_message(f"[WARNING] Negative cache lookup failed for {url}: {e}")
+
+    try:
+        response = session.head(url, timeout=timeout, allow_redirects=True) # Status only, no image body
+        if response.status_code in (405, 501): # Server rejects HEAD: fall back to GET without reading the body
+            response = session.get(url, timeout=timeout, stream=True)
+            response.close()
+        if response.status_code >= 400:
+            _record_failure(neg_cache, url, response.status_code)
+            return False
+        return True
     except requests.RequestException:
+        _record_failure(neg_cache, url, None)
         return False
 
+def _record_failure(neg_cache, url, status): # Stores a failed check in the negative cache, if any; cache errors are only logged.
+    if neg_cache is None:
+        return
+    try:
+        neg_cache.record(url, status)
+    except Exception as e:
+        log_message(f"[WARNING] Negative cache update failed for {url}: {e}")
+
+def _resolved(value): # A completed future, for checks whose outcome is known without a network call
+    future = concurrent.futures.Future()
+    future.set_result(value)
+    return future
+
+_KNOWN_OK, _KNOWN_BROKEN = _resolved(True), _resolved(False)
+
+def canonicalize_url(url): # Normalizes a URL so trivial variants (case, fragment, empty or reordered query) share one visited key.
+    parsed = urlparse(url)
+    query = "&".join(sorted(part for part in parsed.query.split("&") if part)) # Raw segments, never decoded, so the fetched URL keeps its exact encoding
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/", parsed.params, query, ""))
+
 class WebsiteScanner: # Website scanner with depth
     """Crawls a website up to `depth` levels, scanning each page for broken images.
-    Uses BFS to avoid deep recursion. Observers are notified for each page."""
-    def __init__(self, base_url, observers, depth=1, timeout=5):
+    Uses BFS to avoid deep recursion; all pages of one depth level are fetched in parallel.
+    Observers are notified for each page."""
+    def __init__(self, base_url, observers, depth=1, timeout=DEFAULT_TIMEOUT, strict_parse=False,
+                 img_workers=32, page_workers=8, neg_cache=None, allowlist=None):
         self.base_url = base_url
         self.observers = observers
         self.depth = depth
         self.timeout = timeout
+        self.strict_parse = strict_parse
+        self.neg_cache = neg_cache
+        self.page_workers = page_workers
+        self.allowlist = allowlist # Compiled regex of image URLs trusted without checking, or None
         self.visited = set()
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": "Mozilla/5.0"})
+        pool_size = img_workers + page_workers # One pooled connection per worker thread, otherwise extra threads queue for a socket
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                                              raise_on_status=False, respect_retry_after_header=False)) # A long Retry-After would stall a worker
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.img_pool = concurrent.futures.ThreadPoolExecutor(max_workers=img_workers) # Shared by all pages so image checks overlap across the crawl
+        self.url_status = {} # img_url -> future of is_image_ok; each distinct image URL is probed at most once per scan
+        self.url_status_lock = threading.Lock()
 
         parsed_base = urlparse(self.base_url)
-        self.base_domain = parsed_base.netloc
+        self.base_domain = parsed_base.netloc.lower()
 
     def scan(self): # Orchestrates BFS across the website up to the specified depth.
         log_message(f"[START] Scanning up to depth={self.depth}, base URL: {self.base_url}")
-        queue = deque([(self.base_url, 0)])
-        self.visited.add(self.base_url)
+        layer = [canonicalize_url(self.base_url)]
+        self.visited.update(layer)
 
         for obs in self.observers:
             if hasattr(obs, "set_start_time"):
                 obs.set_start_time()
 
-        while queue:
-            current_url, current_depth = queue.popleft()
-            log_message(f"[CRAWLING] {current_url} (depth={current_depth})")
-
-            html = self._fetch_page(current_url) # Fetch and parse page
-            if not html:
-                continue  # If fetch failed or non-HTML, skip
-
-            broken_images = self._scan_images(current_url, html) # Detect broken images for this page
-
+        pending = [] # (page_url, checks) pairs; their image checks keep running while later pages are crawled
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.page_workers) as page_pool:
+            for current_depth in range(self.depth + 1):
+                if not layer:
+                    break
+                for current_url in layer:
+                    log_message(f"[CRAWLING] {current_url} (depth={current_depth})")
+
+                fetches = {page_pool.submit(self._fetch_page, url): index for index, url in enumerate(layer)} # Fetch the whole layer in parallel
+                scanned = [None] * len(layer) # Per-page (checks, hrefs), indexed by layer position
+                for future in concurrent.futures.as_completed(fetches): # Handle pages as they arrive so image checks start early
+                    index = fetches[future]
+                    page = future.result()
+                    if not page:
+                        continue  # If fetch failed or non-HTML, skip
+                    img_srcs, hrefs = self._parse_page(*page) # Parsed once, shared by image scan and link extraction
+                    scanned[index] = (self._scan_images(layer[index], img_srcs), hrefs) # Queue image checks for this page
+
+                next_layer = []
+                for current_url, result in zip(layer, scanned): # Back in layer order, so crawl and report order stay deterministic
+                    if result is None:
+                        continue
+                    checks, hrefs = result
+                    pending.append((current_url, checks))
+
+                    if current_depth < self.depth: # If we haven't reached depth limit, collect new links for the next layer
+                        new_links = self._extract_links(current_url, hrefs)
+                        for link in new_links:
+                            if link not in self.visited:
+                                self.visited.add(link)
+                                next_layer.append(link)
+                layer = next_layer
+
+        for page_url, checks in pending:
+            broken_images = self._collect_broken(page_url, checks) # Detect broken images for this page
             for obs in self.observers: # Notify observers
-                obs.update(current_url, broken_images)
-
-            if current_depth < self.depth: # If we haven't reached depth limit, enqueue new links from this page
-                new_links = self._extract_links(current_url, html)
-                for link in new_links:
-                    if link not in self.visited:
-                        self.visited.add(link)
-                        queue.append((link, current_depth + 1))
+                obs.update(page_url, broken_images)
+        self.img_pool.shutdown(wait=True)
 
         for obs in self.observers:
             if hasattr(obs, "set_end_time"):
@@ -153,48 +300,130 @@ class WebsiteScanner: # Website scanner with depth
 
         log_message("[DONE] Website scan completed.")
 
-    def _fetch_page(self, url): # Uses requests to get HTML from the given URL.
+    def _fetch_page(self, url): # Uses requests to get (raw HTML bytes, declared charset or None) from the given URL.
         try:
-            resp = self.session.get(url, timeout=self.timeout)
-            if "text/html" not in resp.headers.get("Content-Type", ""):
-                log_message(f"[WARNING] Non-HTML content: {url}")
-                return None
-            return resp.text
+            with self.session.get(url, timeout=self.timeout, stream=True) as resp: # Only headers are read until the body is requested
+                if "text/html" not in resp.headers.get("Content-Type", ""):
+                    log_message(f"[WARNING] Non-HTML content: {url}")
+                    return None
+                try:
+                    length = int(resp.headers.get("Content-Length") or 0)
+                except ValueError: # Malformed header (e.g. "10, 10"): treat as absent, the running byte count below still caps the body
+                    length = 0
+                if length > MAX_PAGE_BYTES:
+                    log_message(f"[WARNING] Page too large ({length} bytes): {url}")
+                    return None
+                body = bytearray()
+                for chunk in resp.iter_content(chunk_size=1 << 16): # Content-Length may be absent or compressed, so cap while reading too
+                    body += chunk
+                    if len(body) > MAX_PAGE_BYTES:
+                        log_message(f"[WARNING] Page exceeds {MAX_PAGE_BYTES} bytes: {url}")
+                        return None
+                if not body:
+                    return None
+                return bytes(body), _declared_charset(resp.headers["Content-Type"])
         except requests.RequestException as e:
             log_message(f"[ERROR] {e} while accessing {url}")
             return None # Returns None if an error or non-HTML.
-
-    def _scan_images(self, page_url, html_content): # Parses the page for <img> tags checks each image in parallel, returns a list of broken.
-        soup = BeautifulSoup(html_content, "html.parser")
-        img_tags = soup.find_all("img")
- 
-        image_urls = [urljoin(page_url, tag.get("src", "")) for tag in img_tags if tag.get("src")] # Build absolute URLs for each <img>
-
-        broken = [] # Check concurrency for images
-        with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-            future_map = {executor.submit(is_image_ok, self.session, img_url, self.timeout): img_url for img_url in image_urls}
-            for future in concurrent.futures.as_completed(future_map):
-                img_url = future_map[future]
-                try:
-                    if not future.result():
-                        broken.append(img_url)
-                        log_message(f"[BROKEN IMAGE] {img_url} (page: {page_url})")
-                except Exception as exc:
-                    log_message(f"[DEBUG] Exception while checking {img_url}: {exc}")
-
+        except Exception as e: # Runs inside the page pool: keep one bad page from aborting the whole layer
+            log_message(f"[ERROR] Unexpected {e!r} while accessing {url}")
+            return None
+
+    def _parse_page(self, html_bytes, charset=None): # Returns the (img src values, a href values) found in the page.
+        if self.strict_parse: # Streaming lxml parse for pathological HTML (unquoted attributes, odd markup)
+            img_srcs, hrefs = [], []
+            try:
+                for _, elem in etree.iterparse(BytesIO(html_bytes), tag=PAGE_TAGS, html=True, recover=True, encoding=charset):
+                    if elem.tag == "img":
+                        img_srcs.append(elem.get("src"))
+                    elif elem.get("href") is not None:
+                        hrefs.append(elem.get("href"))
+                    elem.clear() # Drop handled elements and their finished siblings so memory stays flat on huge pages
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+            except etree.XMLSyntaxError: # Nothing parseable, e.g. a whitespace-only body
+                pass
+            return img_srcs, hrefs
+        encoding = charset or "utf-8" # The fast path does not read <meta charset>; without a header charset it assumes UTF-8
+        return ([_decode_attr(m.group(2), encoding) for m in IMG_RE.finditer(html_bytes)],
+                [_decode_attr(m.group(2), encoding) for m in A_RE.finditer(html_bytes)])
+
+    def _scan_images(self, page_url, img_srcs): # Starts a check for each <img> src of the page, returns a list of (img_url, future).
+        checks = {} # Absolute URL for each <img> -> its check, each listed once per page
+        for src in img_srcs:
+            if not src:
+                continue
+            if _is_pseudo_url(src): # Inline or pseudo URLs are never fetchable, skip urljoin and the pool
+                checks[src] = _KNOWN_BROKEN
+                continue
+            img_url = urljoin(page_url, src)
+            if img_url in checks:
+                continue
+            if self.allowlist is not None and self.allowlist.search(img_url): # Trusted, bypasses both caches and the network
+                checks[img_url] = _KNOWN_OK
+            else:
+                checks[img_url] = self._checked_ok(img_url)
+        return list(checks.items())
+
+    def _checked_ok(self, img_url): # Returns the future for img_url's check, submitting it to the pool only on a cache miss.
+        with self.url_status_lock:
+            future = self.url_status.get(img_url)
+            if future is None:
+                future = self.img_pool.submit(is_image_ok, self.session, img_url, self.timeout, self.neg_cache)
+                self.url_status[img_url] = future
+        return future
+
+    def _collect_broken(self, page_url, checks): # Waits for the page's image checks, returns a list of broken.
+        broken = []
+        for img_url, future in checks:
+            try:
+                if not future.result():
+                    broken.append(img_url)
+                    log_message(f"[BROKEN IMAGE] {img_url} (page: {page_url})")
+            except Exception as exc:
+                log_message(f"[DEBUG] Exception while checking {img_url}: {exc}")
         return broken
 
-    def _extract_links(self, page_url, html_content): # Finds internal links (<a href="...">) in the page that match the base domain
-        soup = BeautifulSoup(html_content, "html.parser")
-        links = soup.find_all("a", href=True)
-        new_links = []
-        for tag in links:
-            href = tag["href"]
-            full_link = urljoin(page_url, href)
+    def _extract_links(self, page_url, hrefs): # Finds internal links (<a href="...">) in the page that match the base domain
+        new_links = {} # Insertion-ordered set: each link once, menus repeat them many times per page
+        for href in hrefs:
+            if _is_pseudo_url(href):
+                continue
+            full_link = canonicalize_url(urljoin(page_url, href))
+            if full_link in new_links:
+                continue
             parsed = urlparse(full_link)
             if parsed.netloc == self.base_domain and parsed.scheme in ("http", "https"): # Only follow links within the same domain
-                new_links.append(full_link)
-        return new_links  # Returns a list of absolute URLs for BFS queueing.
+                new_links[full_link] = None
+        return list(new_links)  # Returns a list of canonical absolute URLs for BFS queueing.
+
+def parse_timeout(value): # argparse type for --timeout: "10" -> 10.0, "3,15" -> (3.0, 15.0) as (connect, read)
+    try:
+        parts = [float(part) for part in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid timeout: {value!r}")
+    if not all(math.isfinite(part) and part > 0 for part in parts): # urllib3 rejects these on every request
+        raise argparse.ArgumentTypeError(f"invalid timeout: {value!r} (must be finite and greater than 0)")
+    if len(parts) == 1:
+        return parts[0]
+    if len(parts) == 2:
+        return tuple(parts)
+    raise argparse.ArgumentTypeError(f"invalid timeout: {value!r} (expected SECONDS or CONNECT,READ)")
+
+def positive_int(value): # argparse type for worker counts: ThreadPoolExecutor needs at least one worker
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count: {value!r}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"invalid count: {value!r} (must be greater than 0)")
+    return number
+
+def parse_regex(value): # argparse type for --allowlist-regex: compiles the pattern, reporting syntax errors as usage errors
+    try:
+        return re.compile(value)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"invalid regex {value!r}: {e}")
 
 def parse_arguments():
     parser = argparse.ArgumentParser(
@@ -203,20 +432,37 @@ def parse_arguments():
     parser.add_argument("--url", required=True, help="Base URL to start scanning.")
     parser.add_argument("--output", default="report.html", help="HTML report output.")
     parser.add_argument("--depth", type=int, default=1, help="Depth of recursion (default=1).")
-    parser.add_argument("--timeout", type=int, default=5, help="HTTP request timeout (seconds).")
+    parser.add_argument("--timeout", type=parse_timeout, default=DEFAULT_TIMEOUT,
+                        help="HTTP request timeout in seconds, or CONNECT,READ pair (default=3.05,15).")
+    parser.add_argument("--page-workers", type=positive_int, default=8, help="Pages fetched in parallel per depth level (default=8).")
+    parser.add_argument("--img-workers", type=positive_int, default=32, help="Concurrent image checks across the whole crawl (default=32).")
+    parser.add_argument("--neg-ttl", type=float, default=NEG_TTL, help=f"Seconds to trust a cached image failure (default={NEG_TTL}).")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the persistent negative cache.")
+    parser.add_argument("--allowlist-regex", type=parse_regex, help="Image URLs matching this regex are treated as OK without being checked.")
+    parser.add_argument("--strict-parse", action="store_true", help="Parse pages with a streaming lxml parser instead of the regex fast path.")
     return parser.parse_args()
 
 def main():
     args = parse_arguments() 
     asset_observer = BrokenAssetObserver()  
     report_observer = ReportGeneratorObserver(args.output)
+    neg_cache = None if args.no_cache else NegativeCache(ttl=args.neg_ttl)
     scanner = WebsiteScanner(
         base_url=args.url,
         observers=[asset_observer, report_observer],
         depth=args.depth,
-        timeout=args.timeout
+        timeout=args.timeout,
+        strict_parse=args.strict_parse,
+        img_workers=args.img_workers,
+        page_workers=args.page_workers,
+        neg_cache=neg_cache,
+        allowlist=args.allowlist_regex
     )
-    scanner.scan()
+    try:
+        scanner.scan()
+    finally:
+        if neg_cache is not None:
+            neg_cache.close()
     report_observer.generate_report()
 
 if __name__ == "__main__":